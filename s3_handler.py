@@ -1,15 +1,31 @@
 import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
-from typing import Dict, Optional, Callable, Tuple, List, Any
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError, NoCredentialsError, HTTPClientError, IncompleteReadError
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, Callable, Tuple, List, Any, Iterator
 import os
 import sys
 import datetime
 import json
+import threading
+import time
 
 # Add project root to path for logger import
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 import logger
 
+# Defaults for the download scheduler. get_s3_client() sizes the connection
+# pool to at least the worker count so workers never wait on a connection.
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+PART_RETRIES = 3
+
+# Network errors raised while a ranged part is being fetched or streamed.
+# boto3 only retries these before the body starts streaming, so parts retry them.
+RETRYABLE_ERRORS = (BotocoreConnectionError, HTTPClientError, IncompleteReadError)
+
 def get_mfa_session_token(config: Dict[str, str], mfa_token: str) -> Dict[str, Any]:
     """
     Requests a temporary session token from STS using MFA.
@@ -90,11 +106,17 @@ def is_session_valid(session_data: Optional[Dict[str, Any]]) -> bool:
         logger.log_error(f"Error validating session expiration: {e}")
         return False
 
-def get_s3_client(config: Dict[str, str], mfa_token: Optional[str] = None, session_data: Optional[Dict[str, Any]] = None):
+def get_s3_client(
+    config: Dict[str, str],
+    mfa_token: Optional[str] = None,
+    session_data: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None
+):
     """
     Establishes a session with Wasabi and returns an S3 client.
     Handles MFA authentication if mfa_serial_number and mfa_token are provided,
-    or uses provided session_data.
+    or uses provided session_data. When max_workers is given, the connection
+    pool is sized so that many parallel transfers can share the client.
     """
     try:
         logger.log_debug("Creating S3 client session")
@@ -131,6 +153,9 @@ def get_s3_client(config: Dict[str, str], mfa_token: Optional[str] = None, sessi
             logger.log_debug(f"Using custom SSL certificate: {config['ssl_verify_path']}")
             client_params['verify'] = config['ssl_verify_path']
 
+        if max_workers:
+            client_params['config'] = Config(max_pool_connections=max(10, max_workers))
+
         s3_client = boto3.client(
             's3',
             **client_params
@@ -161,23 +186,200 @@ def get_object_info(s3_client, bucket_name: str, source_key: str) -> Dict[str, A
             logger.log_error(f"Error getting object info: {e}")
             raise e
 
-def list_objects_in_prefix(s3_client, bucket_name: str, source_prefix: str = '') -> Tuple[List[Dict[str, Any]], int]:
-    """Lists all objects under a prefix, returning the list and their total size."""
+def iter_objects_in_prefix(s3_client, bucket_name: str, source_prefix: str = '') -> Iterator[Dict[str, Any]]:
+    """Yields every object under a prefix page by page, without retaining the listing."""
     logger.log_debug(f"Listing objects with prefix: '{source_prefix}' in bucket: {bucket_name}")
     paginator = s3_client.get_paginator('list_objects_v2')
     pages = paginator.paginate(Bucket=bucket_name, Prefix=source_prefix)
 
-    objects_to_download = []
-    total_size = 0
     page_count = 0
     for page in pages:
         page_count += 1
-        if 'Contents' in page:
-            for obj in page['Contents']:
-                if obj['Size'] > 0: # Skip directories
-                    objects_to_download.append(obj)
-                    total_size += obj['Size']
-    logger.log_debug(f"Found {len(objects_to_download)} objects across {page_count} pages, total size: {total_size} bytes")
+        yield from page.get('Contents', [])
+    logger.log_debug(f"Listed {page_count} pages")
+
+def iter_object_versions_in_prefix(s3_client, bucket_name: str, source_prefix: str = '') -> Iterator[Dict[str, Any]]:
+    """
+    Yields every object version and delete marker under a prefix page by page.
+    Delete markers are tagged with 'IsDeleteMarker': True.
+    """
+    logger.log_debug(f"Listing object versions with prefix: '{source_prefix}' in bucket: {bucket_name}")
+    paginator = s3_client.get_paginator('list_object_versions')
+    pages = paginator.paginate(Bucket=bucket_name, Prefix=source_prefix)
+
+    page_count = 0
+    for page in pages:
+        page_count += 1
+        yield from page.get('Versions', [])
+        for marker in page.get('DeleteMarkers', []):
+            yield {**marker, 'IsDeleteMarker': True}
+    logger.log_debug(f"Listed {page_count} version pages")
+
+def write_listing_cache(
+    entries: Iterator[Dict[str, Any]],
+    filepath: str,
+    bucket_name: str,
+    source_prefix: str,
+    kind: str = 'objects'
+) -> Iterator[Dict[str, Any]]:
+    """
+    Passes entries through while writing them to a JSON Lines cache file.
+    The cache is only put in place once the listing has been fully consumed.
+    """
+    tmp_path = filepath + '.tmp'
+    completed = False
+    entry_count = 0
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            header = {
+                'bucket': bucket_name,
+                'source': source_prefix,
+                'kind': kind,
+                'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            }
+            f.write(json.dumps(header) + '\n')
+            for entry in entries:
+                f.write(json.dumps(entry, default=lambda v: v.isoformat() if isinstance(v, datetime.datetime) else str(v)) + '\n')
+                entry_count += 1
+                yield entry
+        os.replace(tmp_path, filepath)
+        completed = True
+        logger.log_debug(f"Listing cache with {entry_count} entries saved to {filepath}")
+    finally:
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _iter_listing_cache_entries(filepath: str, source_prefix: str) -> Iterator[Dict[str, Any]]:
+    """Yields the entries of a listing cache file that fall under source_prefix."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        f.readline() # Skip header
+        for line in f:
+            entry = json.loads(line)
+            if not entry['Key'].startswith(source_prefix):
+                continue
+            entry['LastModified'] = datetime.datetime.fromisoformat(entry['LastModified'])
+            yield entry
+
+def read_listing_cache(filepath: str, bucket_name: str, source_prefix: str, kind: str = 'objects') -> Optional[Iterator[Dict[str, Any]]]:
+    """
+    Returns an iterator over a cached listing, or None if the cache is missing.
+
+    Raises:
+        ValueError: If the file is not a listing cache, or was made for a different
+            bucket, listing kind or a prefix that does not cover source_prefix.
+            The file is left untouched; callers overwrite it only by passing
+            refresh_cache=True to iter_listing().
+    """
+    if not os.path.exists(filepath):
+        logger.log_debug(f"Listing cache not found at {filepath}")
+        return None
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+    except Exception as e:
+        raise ValueError(f"'{filepath}' is not a readable listing cache ({e}). Use --refresh-cache to overwrite it.")
+
+    if header.get('bucket') != bucket_name or header.get('kind') != kind or not source_prefix.startswith(header.get('source', '')):
+        raise ValueError(
+            f"Listing cache '{filepath}' was made for bucket '{header.get('bucket')}', source '{header.get('source')}' "
+            f"({header.get('kind')} listing). Use --refresh-cache to overwrite it, or choose another --cache file."
+        )
+
+    logger.log_info(f"Using cached listing from '{filepath}' (created {header.get('created')})")
+    return _iter_listing_cache_entries(filepath, source_prefix)
+
+def iter_listing(
+    s3_client,
+    bucket_name: str,
+    source_prefix: str = '',
+    kind: str = 'objects',
+    cache_path: Optional[str] = None,
+    refresh_cache: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the objects ('objects') or versions and delete markers ('versions') under a prefix.
+    When cache_path is given, a matching cache is reused; otherwise the live listing is saved to it.
+    """
+    if cache_path and not refresh_cache:
+        cached = read_listing_cache(cache_path, bucket_name, source_prefix, kind)
+        if cached is not None:
+            return cached
+
+    if kind == 'versions':
+        entries = iter_object_versions_in_prefix(s3_client, bucket_name, source_prefix)
+    else:
+        entries = iter_objects_in_prefix(s3_client, bucket_name, source_prefix)
+
+    if cache_path:
+        return write_listing_cache(entries, cache_path, bucket_name, source_prefix, kind)
+    return entries
+
+def aggregate_prefix_usage(
+    entries: Iterator[Dict[str, Any]],
+    source_prefix: str = '',
+    depth: int = 1,
+    versions: bool = False
+) -> Dict[str, Dict[str, int]]:
+    """
+    Aggregates object count and bytes per sub-prefix, up to depth levels below source_prefix.
+
+    Each object is counted in every enclosing sub-prefix, so a prefix's totals
+    include its children, and the overall totals are keyed by source_prefix
+    itself. In versions mode, 'count'/'bytes' cover current versions only,
+    while 'versions'/'version_bytes' and 'delete_markers' cover the full
+    history. Only the per-prefix totals are retained.
+    """
+    base = source_prefix
+    if source_prefix and not source_prefix.endswith('/'):
+        base = source_prefix.rsplit('/', 1)[0] + '/' if '/' in source_prefix else ''
+
+    usage = {}
+    entry_count = 0
+    for entry in entries:
+        entry_count += 1
+        key = entry['Key']
+        directories = key[len(base):].split('/')[:-1]
+        prefixes = [source_prefix] + [base + '/'.join(directories[:level]) + '/' for level in range(1, min(depth, len(directories)) + 1)]
+
+        delta = {}
+        if entry.get('IsDeleteMarker'):
+            delta['delete_markers'] = 1
+        elif entry['Size'] > 0: # Skip directories
+            if versions:
+                delta['versions'] = 1
+                delta['version_bytes'] = entry['Size']
+            if not versions or entry.get('IsLatest'):
+                delta['count'] = 1
+                delta['bytes'] = entry['Size']
+        if not delta:
+            continue
+
+        for prefix in prefixes:
+            if prefix not in usage:
+                usage[prefix] = {'count': 0, 'bytes': 0}
+                if versions:
+                    usage[prefix].update({'versions': 0, 'version_bytes': 0, 'delete_markers': 0})
+            for field, value in delta.items():
+                usage[prefix][field] += value
+
+    logger.log_debug(f"Aggregated {entry_count} entries into {len(usage)} prefixes")
+    return usage
+
+def list_objects_in_prefix(
+    s3_client,
+    bucket_name: str,
+    source_prefix: str = '',
+    cache_path: Optional[str] = None,
+    refresh_cache: bool = False
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Lists all objects under a prefix, returning the list and their total size."""
+    objects_to_download = []
+    total_size = 0
+    for obj in iter_listing(s3_client, bucket_name, source_prefix, cache_path=cache_path, refresh_cache=refresh_cache):
+        if obj['Size'] > 0: # Skip directories
+            objects_to_download.append(obj)
+            total_size += obj['Size']
+    logger.log_debug(f"Found {len(objects_to_download)} objects, total size: {total_size} bytes")
     return objects_to_download, total_size
 
 def list_object_versions_at_timestamp(s3_client, bucket_name: str, timestamp: datetime.datetime, source_prefix: str = '') -> Tuple[List[Dict[str, Any]], int]:
@@ -210,6 +412,154 @@ def list_object_versions_at_timestamp(s3_client, bucket_name: str, timestamp: da
     logger.log_debug(f"Found {len(objects_to_download)} valid versions, total size: {total_size} bytes")
     return objects_to_download, total_size
 
+def list_objects_changed_since(
+    s3_client,
+    bucket_name: str,
+    watermark: Optional[Dict[str, Any]],
+    source_prefix: str = '',
+    mirrored: Optional[Dict[str, Dict[str, str]]] = None,
+    lag_seconds: int = 3600,
+    collect_keys: bool = False
+) -> Tuple[List[Dict[str, Any]], int, Optional[set]]:
+    """
+    Lists objects under a prefix that changed since the given watermark.
+
+    Only objects modified after watermark - lag_seconds are candidates. The lag
+    window is re-examined on every poll because a LastModified can land behind
+    the watermark (same second, or a multipart upload stamped with its start
+    time); inside it, objects whose ETag matches the mirrored entry are skipped.
+    mirrored maps downloaded keys to their 'ETag' and 'LastModified'.
+
+    S3 offers no server-side filter on LastModified, so pages are still walked,
+    but only changed objects are retained. When collect_keys is True, the set of
+    all keys currently under the prefix is also returned for deletion handling.
+    """
+    logger.log_debug(f"Listing objects changed since watermark {watermark} (lag {lag_seconds}s) with prefix: '{source_prefix}'")
+    mirrored = mirrored or {}
+    cutoff = None
+    if watermark:
+        cutoff = datetime.datetime.fromisoformat(watermark['LastModified']) - datetime.timedelta(seconds=lag_seconds)
+
+    changed_objects = []
+    total_size = 0
+    remote_keys = set() if collect_keys else None
+    for obj in iter_objects_in_prefix(s3_client, bucket_name, source_prefix):
+        if collect_keys:
+            remote_keys.add(obj['Key'])
+        if obj['Size'] == 0: # Skip directories
+            continue
+        key = obj['Key']
+        if cutoff is not None and obj['LastModified'] < cutoff:
+            continue
+        if key in mirrored and mirrored[key]['ETag'] == obj.get('ETag'):
+            continue
+        changed_objects.append(obj)
+        total_size += obj['Size']
+
+    changed_objects.sort(key=lambda o: (o['LastModified'], o['Key']))
+    logger.log_debug(f"Found {len(changed_objects)} changed objects, total size: {total_size} bytes")
+    return changed_objects, total_size, remote_keys
+
+def advance_watermark(
+    watermark: Optional[Dict[str, Any]],
+    changed_objects: List[Dict[str, Any]],
+    failed_objects: List[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the new watermark after a mirror pass.
+
+    The watermark moves up to the last changed object that precedes the first
+    failure, so failed objects (and anything after them) are retried next poll.
+    It never moves backwards, even when late-arriving objects from the lag
+    window are behind it. changed_objects must be sorted by (LastModified, Key).
+    """
+    failed_marks = [(o['LastModified'], o['Key']) for o in failed_objects]
+    first_failure = min(failed_marks) if failed_marks else None
+
+    mark = None
+    if watermark:
+        mark = (datetime.datetime.fromisoformat(watermark['LastModified']), watermark['Key'])
+
+    new_watermark = watermark
+    for obj in changed_objects:
+        obj_mark = (obj['LastModified'], obj['Key'])
+        if first_failure is not None and obj_mark >= first_failure:
+            break
+        if mark is None or obj_mark > mark:
+            new_watermark = {'LastModified': obj['LastModified'].isoformat(), 'Key': obj['Key']}
+    return new_watermark
+
+def prune_mirrored(mirrored: Dict[str, Dict[str, str]], watermark: Optional[Dict[str, Any]], lag_seconds: int) -> bool:
+    """
+    Drops mirrored entries older than the lag window, which are never compared again.
+    Returns True if any entry was removed.
+    """
+    if not watermark:
+        return False
+    cutoff = datetime.datetime.fromisoformat(watermark['LastModified']) - datetime.timedelta(seconds=lag_seconds)
+    stale_keys = [key for key, entry in mirrored.items() if datetime.datetime.fromisoformat(entry['LastModified']) < cutoff]
+    for key in stale_keys:
+        del mirrored[key]
+    return bool(stale_keys)
+
+def save_mirror_state(state: Dict[str, Any], filepath: str):
+    """
+    Saves the mirror state (bucket, prefix, destination, watermark and the
+    mirrored keys) in JSON format.
+    Writes to a temporary file first so an interrupted save never corrupts the state.
+    """
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, filepath)
+    logger.log_debug(f"Mirror state saved to {filepath}")
+
+def load_mirror_state(filepath: str) -> Optional[Dict[str, Any]]:
+    """
+    Loads the mirror state from a file.
+    """
+    if not os.path.exists(filepath):
+        logger.log_debug(f"Mirror state file not found at {filepath}")
+        return None
+    try:
+        with open(filepath, 'r') as f:
+            state = json.load(f)
+        logger.log_debug(f"Mirror state loaded from {filepath}")
+        return state
+    except Exception as e:
+        logger.log_error(f"Failed to load mirror state: {e}")
+        return None
+
+def get_destination_path(destination_dir: str, source_prefix: str, source_key: str) -> str:
+    """Maps an object key to its local path under the destination directory."""
+    prefix_dir = source_prefix
+    if source_prefix and not source_prefix.endswith('/'):
+        prefix_dir = os.path.dirname(source_prefix.rstrip('/'))
+
+    relative_path = os.path.relpath(source_key, start=prefix_dir if prefix_dir else '')
+    return os.path.join(destination_dir, relative_path)
+
+def delete_local_orphans(destination_dir: str, source_prefix: str, mirrored: Dict[str, Dict[str, str]], remote_keys: set) -> List[str]:
+    """
+    Deletes the local copies of mirrored keys that no longer exist under the prefix.
+    Only files written by the mirror are considered, so other files in
+    destination_dir are never touched. Returns the keys that were removed.
+    """
+    removed_keys = []
+    for key in mirrored:
+        if key in remote_keys:
+            continue
+        local_path = get_destination_path(destination_dir, source_prefix, key)
+        try:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+                logger.log_debug(f"Deleted local file not present in bucket: {local_path}")
+            removed_keys.append(key)
+        except OSError as e:
+            logger.log_warning(f"Could not delete {local_path}. Error: {e}")
+    logger.log_debug(f"Deleted {len(removed_keys)} local files not present in bucket")
+    return removed_keys
+
 def download_file(s3_client, bucket_name: str, source_key: str, destination_path: str, callback: Optional[Callable[[int], None]] = None):
     """Downloads a single object to a specific file path."""
     logger.log_debug(f"Downloading file: {source_key} -> {destination_path}")
@@ -225,49 +575,187 @@ def download_file(s3_client, bucket_name: str, source_key: str, destination_path
     except ClientError as e:
         logger.log_warning(f"Could not download {source_key}. Error: {e}")
 
+def plan_transfers(object_list: List[Dict[str, Any]], part_size: int = DEFAULT_PART_SIZE) -> List[Dict[str, Any]]:
+    """
+    Turns a listing into work items ordered largest first.
+
+    Objects larger than part_size are split into ranged parts so a single large
+    object is spread across workers instead of becoming one long tail transfer.
+    Scheduling the largest items first lets the small ones fill in the gaps
+    as workers free up.
+    """
+    work_items = []
+    for index, obj in enumerate(object_list):
+        size = obj['Size']
+        if size > part_size:
+            for start in range(0, size, part_size):
+                end = min(start + part_size, size) - 1
+                work_items.append({'index': index, 'obj': obj, 'start': start, 'end': end, 'size': end - start + 1})
+        else:
+            work_items.append({'index': index, 'obj': obj, 'start': None, 'end': None, 'size': size})
+
+    work_items.sort(key=lambda item: item['size'], reverse=True)
+    return work_items
+
+def _download_range(s3_client, bucket_name: str, obj: Dict[str, Any], part_path: str, start: int, end: int, callback: Optional[Callable[[int], None]] = None):
+    """
+    Downloads one byte range of an object into its offset in part_path.
+    Network errors are retried up to PART_RETRIES times, resuming from the
+    last byte written.
+    """
+    params = {'Bucket': bucket_name, 'Key': obj['Key']}
+    if 'VersionId' in obj:
+        params['VersionId'] = obj['VersionId']
+    elif obj.get('ETag'):
+        # Fail instead of mixing parts if the object is overwritten mid-download
+        params['IfMatch'] = obj['ETag']
+
+    offset = start
+    attempt = 0
+    with open(part_path, 'r+b') as f:
+        while offset <= end:
+            try:
+                response = s3_client.get_object(Range=f"bytes={offset}-{end}", **params)
+                f.seek(offset)
+                for chunk in response['Body'].iter_chunks(1024 * 1024):
+                    f.write(chunk)
+                    offset += len(chunk)
+                    if callback:
+                        callback(len(chunk))
+                if offset <= end:
+                    raise IncompleteReadError(actual_bytes=offset - start, expected_bytes=end - start + 1)
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > PART_RETRIES:
+                    raise
+                logger.log_debug(f"Retrying part of {obj['Key']} from byte {offset} (attempt {attempt}/{PART_RETRIES}): {e}")
+                time.sleep(attempt)
+
 def download_objects(
     s3_client,
     bucket_name: str,
     destination_dir: str,
     source_prefix: str,
     object_list: List[Dict[str, Any]],
-    callback: Optional[Callable[[int], None]] = None
-):
-    """Downloads a list of objects into a destination directory."""
-    logger.log_debug(f"Starting batch download of {len(object_list)} objects to: {destination_dir}")
+    callback: Optional[Callable[[int], None]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    part_size: int = DEFAULT_PART_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Downloads a list of objects into a destination directory and returns the objects that failed.
+
+    Work is scheduled largest first on a shared pool of max_workers threads, with
+    objects larger than part_size downloaded as ranged parts into a '.part' file
+    that is renamed into place once every part has arrived. Any error raised for
+    one work item (after per-part retries) marks only that object as failed.
+    On Ctrl+C or another fatal error, queued transfers are cancelled and the
+    '.part' files of unfinished objects are removed before re-raising.
+    """
+    work_items = plan_transfers(object_list, part_size)
+    logger.log_debug(f"Starting batch download of {len(object_list)} objects as {len(work_items)} transfers "
+                     f"({max_workers} workers) to: {destination_dir}")
+
+    destination_paths = {}
+    pending_parts = {}
+    for item in work_items:
+        index = item['index']
+        if index in destination_paths:
+            pending_parts[index] += 1
+            continue
+        destination_path = get_destination_path(destination_dir, source_prefix, item['obj']['Key'])
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        destination_paths[index] = destination_path
+        pending_parts[index] = 1
+        if item['start'] is not None:
+            # Preallocate so parts can be written at their offsets in any order
+            with open(destination_path + '.part', 'wb') as f:
+                f.truncate(item['obj']['Size'])
+
+    lock = threading.Lock()
+    failed_indexes = set()
     download_count = 0
-    error_count = 0
-    
-    for obj in object_list:
+    cancelled = threading.Event()
+
+    # tqdm.update() is not thread-safe, and every worker reports progress
+    progress_lock = threading.Lock()
+    progress = None
+    if callback:
+        def progress(byte_count: int):
+            with progress_lock:
+                callback(byte_count)
+
+    def run(item: Dict[str, Any]):
+        nonlocal download_count
+        index = item['index']
+        obj = item['obj']
         source_key = obj['Key']
-
-        prefix_dir = source_prefix
-        if source_prefix and not source_prefix.endswith('/'):
-            prefix_dir = os.path.dirname(source_prefix.rstrip('/'))
-
-        relative_path = os.path.relpath(source_key, start=prefix_dir if prefix_dir else '')
-        destination_path = os.path.join(destination_dir, relative_path)
-
-        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
-
-        extra_args = {}
-        if 'VersionId' in obj:
-            extra_args['VersionId'] = obj['VersionId']
-            logger.log_debug(f"Downloading versioned object: {source_key} (Version: {obj['VersionId']})")
-        else:
-            logger.log_debug(f"Downloading object: {source_key}")
+        destination_path = destination_paths[index]
+        succeeded = False
 
         try:
-            s3_client.download_file(
-                Bucket=bucket_name,
-                Key=source_key,
-                Filename=destination_path,
-                ExtraArgs=extra_args if extra_args else None,
-                Callback=callback
-            )
-            download_count += 1
-        except ClientError as e:
-            error_count += 1
-            logger.log_warning(f"Could not download {source_key} (Version: {obj.get('VersionId', 'N/A')}). Error: {e}")
-    
-    logger.log_debug(f"Batch download complete: {download_count} successful, {error_count} errors")
+            if item['start'] is None:
+                extra_args = {}
+                if 'VersionId' in obj:
+                    extra_args['VersionId'] = obj['VersionId']
+                    logger.log_debug(f"Downloading versioned object: {source_key} (Version: {obj['VersionId']})")
+                else:
+                    logger.log_debug(f"Downloading object: {source_key}")
+                s3_client.download_file(
+                    Bucket=bucket_name,
+                    Key=source_key,
+                    Filename=destination_path,
+                    ExtraArgs=extra_args if extra_args else None,
+                    Callback=progress,
+                    # Concurrency comes from the shared worker pool, not per-object threads
+                    Config=TransferConfig(use_threads=False)
+                )
+            elif index not in failed_indexes:
+                logger.log_debug(f"Downloading part bytes={item['start']}-{item['end']} of: {source_key}")
+                _download_range(s3_client, bucket_name, obj, destination_path + '.part', item['start'], item['end'], progress)
+            succeeded = True
+        except Exception as e:
+            with lock:
+                if index not in failed_indexes:
+                    failed_indexes.add(index)
+                    logger.log_warning(f"Could not download {source_key} (Version: {obj.get('VersionId', 'N/A')}). Error: {e}")
+        finally:
+            with lock:
+                if not succeeded:
+                    failed_indexes.add(index)
+                pending_parts[index] -= 1
+                finished = pending_parts[index] == 0
+                failed = index in failed_indexes
+            if cancelled.is_set():
+                # The batch was aborted; the main thread cleans up unfinished objects
+                return
+            if finished and not failed:
+                if item['start'] is not None:
+                    os.replace(destination_path + '.part', destination_path)
+                with lock:
+                    download_count += 1
+            elif finished and item['start'] is not None and os.path.exists(destination_path + '.part'):
+                os.remove(destination_path + '.part')
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(run, item) for item in work_items]
+        for future in as_completed(futures):
+            future.result()
+    except BaseException:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        with lock:
+            unfinished = [index for index, remaining in pending_parts.items() if remaining > 0]
+        for index in unfinished:
+            part_path = destination_paths[index] + '.part'
+            try:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+            except OSError as e:
+                logger.log_warning(f"Could not remove {part_path}. Error: {e}")
+        raise
+    executor.shutdown()
+
+    failed_objects = [object_list[index] for index in sorted(failed_indexes)]
+    logger.log_debug(f"Batch download complete: {download_count} successful, {len(failed_objects)} errors")
+    return failed_objects
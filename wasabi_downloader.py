@@ -1,18 +1,28 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import argparse
 import os
 import sys
 import datetime
 import getpass
-from tqdm import tqdm
-from botocore.exceptions import ClientError
+import contextlib
 
 # Add project root to path to allow sibling module imports
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 import config_loader
-import s3_handler
 import logger
 
+# s3_handler (boto3/botocore) and tqdm are imported inside the commands that
+# need them, so --help, argument errors and a no-op 'mfa' stay fast.
+
+# Commands that show a tqdm progress bar
+PROGRESS_COMMANDS = ('download_file', 'download_dir', 'download_versioned', 'mirror')
+
+# Time spent importing this module's own dependencies, reported by --profile-startup
+_MODULE_IMPORT_TIME = time.perf_counter() - _IMPORT_START
+
 # --- Helper Functions ---
 
 def get_app_root() -> str:
@@ -41,15 +51,140 @@ def format_bytes(byte_count: int) -> str:
         n += 1
     return f"{byte_count:.2f} {power_labels[n]}B"
 
+def run_mirror(args, session_data, s3_client, bucket_name: str, destination_dir: str, state_file: str):
+    """
+    Polls the prefix and downloads objects changed since the persisted watermark.
+    Runs until interrupted, or for a single pass when --once is given.
+    A failed poll is logged and retried at the next interval; only MFA expiry
+    and Ctrl+C stop the loop.
+    """
+    import s3_handler
+    from tqdm import tqdm
+
+    state = s3_handler.load_mirror_state(state_file)
+    if state and (state.get('bucket') != bucket_name or state.get('source') != args.source
+                  or state.get('destination') != os.path.abspath(destination_dir)):
+        logger.log_warning(f"Mirror state in '{state_file}' belongs to a different bucket/source/destination. Starting a full sync.")
+        state = None
+    watermark = state.get('watermark') if state else None
+    mirrored = state.get('files', {}) if state else {}
+
+    logger.log(f"Mirroring '{args.source if args.source else 'bucket root'}' to '{destination_dir}'...")
+    if watermark:
+        logger.log(f"Resuming from watermark: {watermark['LastModified']} ({watermark['Key']})")
+
+    try:
+        while True:
+            # The client was built from session_data, so that is what has to stay valid
+            if session_data and not s3_handler.is_session_valid(session_data):
+                raise ValueError("MFAセッションが期限切れか、実行されていません。'mfa'コマンドを先に実行してください。")
+
+            try:
+                state_changed = False
+                changed_objects, total_size, remote_keys = s3_handler.list_objects_changed_since(
+                    s3_client, bucket_name, watermark, args.source, mirrored, args.lag, collect_keys=args.delete
+                )
+
+                if changed_objects:
+                    logger.log(f"Found {len(changed_objects)} changed files with a total size of {format_bytes(total_size)}.")
+                    with tqdm(total=total_size, unit='B', unit_scale=True, desc="Mirror Progress") as pbar:
+                        failed_objects = s3_handler.download_objects(
+                            s3_client, bucket_name, destination_dir, args.source, changed_objects, pbar.update,
+                            max_workers=args.workers, part_size=args.part_size * 1024 * 1024
+                        )
+                    failed_keys = {obj['Key'] for obj in failed_objects}
+                    for obj in changed_objects:
+                        if obj['Key'] not in failed_keys:
+                            mirrored[obj['Key']] = {'ETag': obj.get('ETag'), 'LastModified': obj['LastModified'].isoformat()}
+                            state_changed = True
+                    new_watermark = s3_handler.advance_watermark(watermark, changed_objects, failed_objects)
+                    state_changed = state_changed or new_watermark != watermark
+                    watermark = new_watermark
+                    logger.log(f"Downloaded {len(changed_objects) - len(failed_objects)} files, {len(failed_objects)} failed.")
+                else:
+                    logger.log("No changes found.")
+
+                if args.delete:
+                    removed_keys = s3_handler.delete_local_orphans(destination_dir, args.source, mirrored, remote_keys)
+                    for key in removed_keys:
+                        del mirrored[key]
+                    if removed_keys:
+                        state_changed = True
+                        logger.log(f"Deleted {len(removed_keys)} local files no longer present in the bucket.")
+                elif s3_handler.prune_mirrored(mirrored, watermark, args.lag):
+                    # Without --delete, only the lag window's ETags are needed
+                    state_changed = True
+
+                if state_changed:
+                    s3_handler.save_mirror_state({
+                        'bucket': bucket_name,
+                        'source': args.source,
+                        'destination': os.path.abspath(destination_dir),
+                        'watermark': watermark,
+                        'files': mirrored,
+                    }, state_file)
+            except Exception as e:
+                if args.once:
+                    raise
+                # Transient network/service errors: keep the last saved watermark and retry next poll
+                logger.log_error(f"Mirror poll failed: {e}. Retrying in {args.interval} seconds.")
+
+            if args.once:
+                break
+            logger.log_debug(f"Sleeping {args.interval} seconds until next poll")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        logger.log("\nMirror stopped.")
+
+def add_cache_arguments(parser: argparse.ArgumentParser):
+    """Adds the listing cache options shared by list_files, du and download_dir."""
+    parser.add_argument('--cache', help='Local listing cache file. Reused if it matches the bucket/source, written from a fresh listing if it does not exist.')
+    parser.add_argument('--refresh-cache', action='store_true', help='Ignore an existing cache file and overwrite it with a fresh listing.')
+
+def add_transfer_arguments(parser: argparse.ArgumentParser):
+    """Adds the download scheduler options shared by the batch download commands."""
+    parser.add_argument('--workers', type=int, default=8, help='Number of parallel transfers. Defaults to 8.')
+    parser.add_argument('--part-size', type=int, default=64, help='Files larger than this (in MB) are split into ranged parts of this size. Defaults to 64.')
+
+def get_handled_errors() -> tuple:
+    """
+    Returns the exception types reported as plain errors.
+    ClientError is included only once botocore has actually been imported.
+    """
+    errors = (FileNotFoundError, ValueError)
+    botocore_exceptions = sys.modules.get('botocore.exceptions')
+    if botocore_exceptions is not None:
+        errors += (botocore_exceptions.ClientError,)
+    return errors
+
+@contextlib.contextmanager
+def profile_step(timings: dict, name: str):
+    """Records the wall time spent in the block under timings[name]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start)
+
+def report_startup_profile(timings: dict):
+    """Logs the time spent in each startup phase."""
+    for name in ('import', 'config', 'session', 'client'):
+        if name in timings:
+            logger.log_info(f"Startup profile: {name:<7} {timings[name] * 1000:8.1f} ms")
+    logger.log_info(f"Startup profile: total   {sum(timings.values()) * 1000:8.1f} ms (sum of the phases above)")
+
 # --- Main Logic ---
 
 def main():
     """Main function to run the downloader."""
     # Initialize logger at the start
     logger.init_logger(mode='w')
+    timings = {'import': _MODULE_IMPORT_TIME}
+    profile_startup = False
     
     try:
         parser = argparse.ArgumentParser(description="Wasabi Hot Cloud Storage File Download Tool")
+        parser.add_argument('--profile-startup', action='store_true', help='Report time spent in import, config, session and client creation.')
         subparsers = parser.add_subparsers(dest='command', required=True, help='Available commands')
 
         # --- download_file ---
@@ -61,21 +196,48 @@ def main():
         parser_dir = subparsers.add_parser('download_dir', help='Download an entire directory (prefix).')
         parser_dir.add_argument('--source', default='', help='The source directory (prefix) to download. Defaults to the entire bucket.')
         parser_dir.add_argument('--destination', help='Local directory to save files. Defaults to "./Download/".')
+        add_cache_arguments(parser_dir)
+        add_transfer_arguments(parser_dir)
 
         # --- download_versioned ---
         parser_ver = subparsers.add_parser('download_versioned', help='Download all files from a specific point in time.')
         parser_ver.add_argument('--timestamp', required=True, help='The date for version recovery in YYYYMMDD format.')
         parser_ver.add_argument('--source', default='', help='The source directory (prefix) to download. Defaults to the entire bucket.')
         parser_ver.add_argument('--destination', help='Local directory to save files. Defaults to "./Download/".')
+        add_transfer_arguments(parser_ver)
 
         # --- list_files ---
         parser_list = subparsers.add_parser('list_files', help='Recursively list files in a given prefix.')
         parser_list.add_argument('--source', default='', help='The source directory (prefix) to list. Defaults to the entire bucket.')
+        add_cache_arguments(parser_list)
+
+        # --- du ---
+        parser_du = subparsers.add_parser('du', help='Summarize object count and size per sub-prefix.')
+        parser_du.add_argument('--source', default='', help='The source directory (prefix) to summarize. Defaults to the entire bucket.')
+        parser_du.add_argument('--depth', type=int, default=1, help='Number of sub-prefix levels to report. Defaults to 1.')
+        parser_du.add_argument('--versions', action='store_true', help='Also count all versions and delete markers (versioned buckets).')
+        add_cache_arguments(parser_du)
+
+        # --- mirror ---
+        parser_mirror = subparsers.add_parser('mirror', help='Continuously mirror a directory (prefix), downloading only changed files.')
+        parser_mirror.add_argument('--source', default='', help='The source directory (prefix) to mirror. Defaults to the entire bucket.')
+        parser_mirror.add_argument('--destination', help='Local directory to mirror into. Defaults to "./Download/".')
+        parser_mirror.add_argument('--interval', type=int, default=900, help='Seconds to wait between polls. Defaults to 900.')
+        parser_mirror.add_argument('--delete', action='store_true', help='Delete mirrored files that no longer exist in the bucket. Requires --destination.')
+        parser_mirror.add_argument('--lag', type=int, default=3600, help='Seconds before the watermark that are re-checked on every poll, to catch late-arriving objects. Defaults to 3600.')
+        parser_mirror.add_argument('--once', action='store_true', help='Run a single poll and exit (for use from cron).')
+        parser_mirror.add_argument('--state-file', help='Path of the watermark state file. Defaults to ".mirror_state.json" next to the tool.')
+        add_transfer_arguments(parser_mirror)
 
         # --- mfa ---
         subparsers.add_parser('mfa', help='Authenticate with MFA and save session.')
 
         args = parser.parse_args()
+        profile_startup = args.profile_startup
+        if getattr(args, 'workers', 1) < 1 or getattr(args, 'part_size', 1) < 1:
+            parser.error("--workers and --part-size must be at least 1.")
+        if args.command == 'mirror' and args.delete and not args.destination:
+            parser.error("--delete requires an explicit --destination.")
         
         logger.log_info(f"Starting command: {args.command}")
         logger.log_debug(f"Arguments: {vars(args)}")
@@ -84,7 +246,8 @@ def main():
             # 1. Load Configuration
             config_path = os.path.join(get_app_root(), 'config.env')
             logger.log_info(f"Loading configuration from: {config_path}")
-            config = config_loader.load_config(config_path)
+            with profile_step(timings, 'config'):
+                config = config_loader.load_config(config_path)
             logger.log_debug(f"Configuration loaded successfully")
 
             # 2. Handle MFA
@@ -97,24 +260,38 @@ def main():
                     logger.log("MFA is not configured in config.env. Skip authentication.")
                     return
                 mfa_token = getpass.getpass("Enter MFA Token: ")
+                with profile_step(timings, 'import'):
+                    import s3_handler
                 credentials = s3_handler.get_mfa_session_token(config, mfa_token)
                 s3_handler.save_session(credentials, session_file)
                 logger.log("MFA authentication successful. Session saved.")
                 return
 
+            with profile_step(timings, 'import'):
+                import s3_handler
+                if args.command in PROGRESS_COMMANDS:
+                    from tqdm import tqdm
+
             if mfa_required:
-                session_data = s3_handler.load_session(session_file)
-                if not s3_handler.is_session_valid(session_data):
+                with profile_step(timings, 'session'):
+                    session_data = s3_handler.load_session(session_file)
+                    session_valid = s3_handler.is_session_valid(session_data)
+                if not session_valid:
                     raise ValueError("MFAセッションが期限切れか、実行されていません。'mfa'コマンドを先に実行してください。")
 
             # 3. Get S3 Client
             logger.log("Connecting to Wasabi...")
-            s3_client = s3_handler.get_s3_client(config, session_data=session_data)
+            with profile_step(timings, 'client'):
+                s3_client = s3_handler.get_s3_client(config, session_data=session_data, max_workers=getattr(args, 'workers', None))
             logger.log("Connection successful.")
 
             bucket_name = config['bucket_name']
             logger.log_debug(f"Using bucket: {bucket_name}")
 
+            if profile_startup:
+                report_startup_profile(timings)
+                timings.clear()
+
             # 4. Execute Command
             if args.command == 'download_file':
                 destination_path = args.destination if args.destination else os.path.join(get_default_download_dir(), os.path.basename(args.source))
@@ -133,16 +310,38 @@ def main():
 
             elif args.command == 'list_files':
                 logger.log(f"Listing files in: '{args.source if args.source else 'bucket root'}'")
-                object_list, _ = s3_handler.list_objects_in_prefix(s3_client, bucket_name, args.source)
+                file_count = 0
+                for obj in s3_handler.iter_listing(s3_client, bucket_name, args.source, cache_path=args.cache, refresh_cache=args.refresh_cache):
+                    if obj['Size'] > 0: # Skip directories
+                        logger.log(obj['Key'])
+                        file_count += 1
 
-                if not object_list:
+                if file_count == 0:
                     logger.log("No files found in the specified path.")
                     return
 
-                for obj in object_list:
-                    logger.log(obj['Key'])
+                logger.log(f"\nTotal files found: {file_count}")
 
-                logger.log(f"\nTotal files found: {len(object_list)}")
+            elif args.command == 'du':
+                logger.log(f"Summarizing '{args.source if args.source else 'bucket root'}' to depth {args.depth}...")
+                kind = 'versions' if args.versions else 'objects'
+                entries = s3_handler.iter_listing(s3_client, bucket_name, args.source, kind=kind, cache_path=args.cache, refresh_cache=args.refresh_cache)
+                usage = s3_handler.aggregate_prefix_usage(entries, args.source, args.depth, versions=args.versions)
+
+                if not usage:
+                    logger.log("No files found in the specified path.")
+                    return
+
+                if args.versions:
+                    logger.log(f"{'Files':>10} {'Size':>12} {'Versions':>10} {'All Versions':>13} {'DelMarkers':>10}  Prefix")
+                else:
+                    logger.log(f"{'Files':>10} {'Size':>12}  Prefix")
+                for prefix in sorted(usage):
+                    stats = usage[prefix]
+                    line = f"{stats['count']:>10} {format_bytes(stats['bytes']):>12}"
+                    if args.versions:
+                        line += f" {stats['versions']:>10} {format_bytes(stats['version_bytes']):>13} {stats['delete_markers']:>10}"
+                    logger.log(f"{line}  {prefix if prefix else '(bucket root)'}")
 
             elif args.command in ['download_dir', 'download_versioned']:
                 destination_dir = args.destination if args.destination else get_default_download_dir()
@@ -152,7 +351,9 @@ def main():
 
                 logger.log(f"Analyzing files in '{args.source if args.source else 'bucket root'}'...")
                 if args.command == 'download_dir':
-                    object_list, total_size = s3_handler.list_objects_in_prefix(s3_client, bucket_name, args.source)
+                    object_list, total_size = s3_handler.list_objects_in_prefix(
+                        s3_client, bucket_name, args.source, cache_path=args.cache, refresh_cache=args.refresh_cache
+                    )
                 else: # download_versioned
                     try:
                         ts = datetime.datetime.strptime(args.timestamp, '%Y%m%d').replace(hour=23, minute=59, second=59, microsecond=999999)
@@ -171,13 +372,19 @@ def main():
                 logger.log(f"Downloading to '{destination_dir}'...")
 
                 with tqdm(total=total_size, unit='B', unit_scale=True, desc="Total Progress") as pbar:
-                    s3_handler.download_objects(
-                        s3_client, bucket_name, destination_dir, args.source, object_list, pbar.update
+                    failed_objects = s3_handler.download_objects(
+                        s3_client, bucket_name, destination_dir, args.source, object_list, pbar.update,
+                        max_workers=args.workers, part_size=args.part_size * 1024 * 1024
                     )
 
-                logger.log(f"\nSuccessfully downloaded {file_count} files.")
+                logger.log(f"\nSuccessfully downloaded {file_count - len(failed_objects)} files, {len(failed_objects)} failed.")
+
+            elif args.command == 'mirror':
+                destination_dir = args.destination if args.destination else get_default_download_dir()
+                state_file = args.state_file if args.state_file else os.path.join(get_app_root(), '.mirror_state.json')
+                run_mirror(args, session_data, s3_client, bucket_name, destination_dir, state_file)
 
-        except (FileNotFoundError, ValueError, ClientError) as e:
+        except get_handled_errors() as e:
             logger.log_error(str(e))
             sys.exit(1)
         except Exception as e:
@@ -185,6 +392,9 @@ def main():
             sys.exit(1)
     
     finally:
+        # Commands that stop before client creation (e.g. 'mfa') report here
+        if profile_startup and timings:
+            report_startup_profile(timings)
         # Always close the logger
         logger.close_logger()
 